@@ -0,0 +1,285 @@
+"""Graphe de flot de contrôle (CFG) sur le code à trois adresses (TAC).
+
+Les blocs de base sont délimités par les étiquettes `Lx:` et par les sauts.
+Le module fournit aussi le décodage des instructions TAC, la redirection
+des sauts, les dominateurs et l'analyse de vivacité, partagés par les
+passes d'analyse (SSA, allocation de registres, ...).
+"""
+import re
+
+# Position de l'étiquette cible dans les opérandes d'un saut
+JUMP_TARGET = {'GOTO': 0, 'IFFALSE': 1, 'IFTRUE': 1,
+               'IFLT': 2, 'IFGT': 2, 'IFLTE': 2, 'IFGTE': 2, 'IFEQ': 2, 'IFNEQ': 2}
+UNCONDITIONAL_JUMPS = ['GOTO']
+
+# Instructions dont le dernier opérande est la destination
+DEF_OPS = ['DECLARE', 'LOAD', 'STORE', 'COPY', 'NOT', 'NEG', 'PHI',
+           'ADD', 'SUB', 'MUL', 'DIV', 'LT', 'GT', 'LTE', 'GTE', 'EQ', 'NEQ']
+
+# Variables du programme et temporaires '%tN' (versions SSA comprises)
+name_regex = re.compile(r'%?[A-Za-z_][\w.]*')
+
+
+def decode(instr):
+    """'ADD t1, 2, t3' -> ('ADD', ['t1', '2', 't3']) ; 'L1:' -> ('LABEL', ['L1'])."""
+    if instr.endswith(':'):
+        return 'LABEL', [instr[:-1]]
+    op, _, rest = instr.partition(' ')
+    if op in JUMP_TARGET and op not in UNCONDITIONAL_JUMPS:
+        operands, _, label = rest.partition(' GOTO ')
+        return op, [a.strip() for a in operands.split(',')] + [label]
+    return op, [a.strip() for a in rest.split(',')] if rest else []
+
+
+def encode(op, args):
+    if op == 'LABEL':
+        return f"{args[0]}:"
+    if op in JUMP_TARGET and op not in UNCONDITIONAL_JUMPS:
+        return f"{op} {', '.join(args[:-1])} GOTO {args[-1]}"
+    return f"{op} {', '.join(args)}" if args else op
+
+
+def jump_target(instr):
+    """Étiquette visée par un saut, None pour les autres instructions."""
+    op, args = decode(instr)
+    return args[JUMP_TARGET[op]] if op in JUMP_TARGET else None
+
+
+def thread_jumps(code):
+    """Redirige chaque saut vers sa cible finale et supprime les sauts inutiles.
+
+    Un saut vers une étiquette suivie d'un GOTO est redirigé directement
+    vers la destination de ce GOTO ; un saut vers l'instruction qui le suit
+    est supprimé, puis les étiquettes devenues inutiles sont retirées. On
+    recommence tant que le code change.
+    """
+    while True:
+        threaded = _thread_jumps_once(code)
+        if threaded == code:
+            return threaded
+        code = threaded
+
+
+def _thread_jumps_once(code):
+    positions = {instr[:-1]: n for n, instr in enumerate(code) if instr.endswith(':')}
+
+    def first_instr(n):
+        while n < len(code) and code[n].endswith(':'):
+            n += 1
+        return n
+
+    def final_target(label):
+        seen = set()
+        while label not in seen:
+            seen.add(label)
+            n = first_instr(positions[label])
+            if n < len(code) and decode(code[n])[0] == 'GOTO':
+                label = jump_target(code[n])
+            else:
+                break
+        return label
+
+    threaded = []
+    for n, instr in enumerate(code):
+        target = jump_target(instr)
+        if target is not None:
+            target = final_target(target)
+            if first_instr(positions[target]) == first_instr(n + 1):
+                continue
+            op, args = decode(instr)
+            args[JUMP_TARGET[op]] = target
+            instr = encode(op, args)
+        threaded.append(instr)
+
+    used = {jump_target(instr) for instr in threaded}
+    return [instr for instr in threaded if not instr.endswith(':') or instr[:-1] in used]
+
+
+def is_name(operand):
+    return operand != 'None' and name_regex.fullmatch(operand) is not None
+
+
+def operand_roles(op, args):
+    """Rôle de chaque opérande : 'def', 'use' ou None (constante, étiquette)."""
+    if op == 'LABEL':
+        return [None]
+    roles = ['use' if is_name(a) else None for a in args]
+    if op in JUMP_TARGET:
+        roles[JUMP_TARGET[op]] = None
+    elif op in DEF_OPS:
+        roles[-1] = 'def'
+    return roles
+
+
+def defs_uses(op, args):
+    roles = operand_roles(op, args)
+    defs = [a for a, r in zip(args, roles) if r == 'def']
+    uses = [a for a, r in zip(args, roles) if r == 'use']
+    return defs, uses
+
+
+class BasicBlock:
+    def __init__(self, index, label=None):
+        self.index = index
+        self.label = label
+        self.instrs = []
+        self.succs = []
+        self.preds = []
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.label}, succs={self.succs})"
+
+
+class CFG:
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.entry = blocks[0]
+
+    def code(self):
+        return [instr for block in self.blocks for instr in block.instrs]
+
+    def reverse_postorder(self):
+        order = []
+        seen = {self.entry.index}
+        stack = [(self.entry.index, iter(self.entry.succs))]
+        while stack:
+            b, succs = stack[-1]
+            for s in succs:
+                if s not in seen:
+                    seen.add(s)
+                    stack.append((s, iter(self.blocks[s].succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(b)
+        order.reverse()
+        return order
+
+    def dominators(self):
+        """Dominateur immédiat de chaque bloc atteignable (Cooper, Harvey, Kennedy).
+
+        Les blocs inatteignables n'apparaissent pas dans le résultat.
+        """
+        order = self.reverse_postorder()
+        rpo_index = {b: i for i, b in enumerate(order)}
+        idom = {order[0]: order[0]}
+
+        def intersect(a, b):
+            while a != b:
+                while rpo_index[a] > rpo_index[b]:
+                    a = idom[a]
+                while rpo_index[b] > rpo_index[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for b in order[1:]:
+                preds = [p for p in self.blocks[b].preds if p in idom]
+                new_idom = preds[0]
+                for p in preds[1:]:
+                    new_idom = intersect(p, new_idom)
+                if idom.get(b) != new_idom:
+                    idom[b] = new_idom
+                    changed = True
+        return idom
+
+    def dominance_frontiers(self, idom=None):
+        idom = self.dominators() if idom is None else idom
+        frontiers = {b: set() for b in idom}
+        for b in idom:
+            preds = [p for p in self.blocks[b].preds if p in idom]
+            if len(preds) < 2:
+                continue
+            for p in preds:
+                runner = p
+                while runner != idom[b]:
+                    frontiers[runner].add(b)
+                    runner = idom[runner]
+        return frontiers
+
+    def dominator_tree(self, idom=None):
+        idom = self.dominators() if idom is None else idom
+        children = {b: [] for b in idom}
+        for b in sorted(idom):
+            if b != self.entry.index:
+                children[idom[b]].append(b)
+        return children
+
+
+def liveness(cfg):
+    """Renvoie (live_in, live_out) : noms vivants à l'entrée / sortie de chaque bloc.
+
+    Fonctionne aussi en forme SSA : les opérandes d'un PHI sont vivants en
+    sortie du prédécesseur correspondant, pas à l'entrée du bloc.
+    """
+    use = {}
+    defs = {}
+    phi_defs = {}
+    phi_uses = {}
+    for block in cfg.blocks:
+        use[block.index] = set()
+        defs[block.index] = set()
+        phi_defs[block.index] = set()
+        for instr in block.instrs:
+            op, args = decode(instr)
+            if op == 'PHI':
+                phi_defs[block.index].add(args[-1])
+                for pred, arg in zip(block.preds, args[:-1]):
+                    phi_uses.setdefault(pred, set()).add(arg)
+                continue
+            d, u = defs_uses(op, args)
+            use[block.index].update(x for x in u if x not in defs[block.index])
+            defs[block.index].update(d)
+
+    live_in = {block.index: set() for block in cfg.blocks}
+    live_out = {block.index: set() for block in cfg.blocks}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(cfg.blocks):
+            b = block.index
+            out = set(phi_uses.get(b, ()))
+            for s in block.succs:
+                out |= live_in[s] - phi_defs[s]
+            new_in = phi_defs[b] | use[b] | (out - defs[b])
+            if out != live_out[b] or new_in != live_in[b]:
+                live_out[b] = out
+                live_in[b] = new_in
+                changed = True
+    return live_in, live_out
+
+
+def build_cfg(code):
+    """Découpe une liste d'instructions TAC en blocs de base reliés."""
+    # Bloc d'entrée vide : l'entrée n'a jamais de prédécesseur, même si le
+    # programme commence par l'étiquette d'une boucle.
+    blocks = [BasicBlock(0)]
+    for instr in code:
+        op, args = decode(instr)
+        current = blocks[-1]
+        if op == 'LABEL':
+            current = BasicBlock(len(blocks), args[0])
+            blocks.append(current)
+        elif current.instrs and decode(current.instrs[-1])[0] in JUMP_TARGET:
+            current = BasicBlock(len(blocks))
+            blocks.append(current)
+        current.instrs.append(instr)
+
+    labels = {block.label: block.index for block in blocks if block.label}
+
+    def add_edge(src, dst):
+        if dst not in blocks[src].succs:
+            blocks[src].succs.append(dst)
+            blocks[dst].preds.append(src)
+
+    for block in blocks:
+        op, args = decode(block.instrs[-1]) if block.instrs else (None, [])
+        falls_through = op not in UNCONDITIONAL_JUMPS
+        if falls_through and block.index + 1 < len(blocks):
+            add_edge(block.index, block.index + 1)
+        if op in JUMP_TARGET:
+            add_edge(block.index, labels[args[JUMP_TARGET[op]]])
+
+    return CFG(blocks)
@@ -0,0 +1,250 @@
+"""Mode démon : un interpréteur MiniPython résident sur un socket Unix.
+
+Le démon garde en cache les programmes déjà analysés. Le client transmet
+le chemin du script et ses arguments, puis recopie la sortie ; un lancement
+ne coûte alors qu'un aller-retour sur le socket.
+
+Ce module n'importe l'interpréteur que côté démon, pour que le client
+reste léger.
+"""
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import threading
+from collections import OrderedDict
+
+# Nombre de programmes compilés gardés en cache
+CACHE_SIZE = 128
+# Durée maximale d'un script exécuté par le démon, en secondes
+TIME_LIMIT = 60
+# Pas d'exécution entre deux vérifications (délai, client toujours là)
+CHECK_EVERY = 10000
+# Sortie accumulée (en caractères) au-delà de laquelle elle part au client
+FLUSH_SIZE = 64 * 1024
+
+
+def default_socket_path():
+    path = os.environ.get('MINIPYTHON_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f"minipython-{os.getuid()}.sock")
+
+
+class ProgramCache:
+    """Programmes compilés, indexés par chemin réel et invalidés sur mtime/taille.
+
+    Seuls les max_size programmes utilisés le plus récemment sont gardés.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.programs = OrderedDict()
+        # Le démon sert chaque client dans son propre thread
+        self.lock = threading.Lock()
+
+    def get(self, filepath):
+        from .interpreter import compile_file
+
+        key = os.path.realpath(filepath)
+        st = os.stat(key)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.programs.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.programs.move_to_end(key)
+                return entry[1], entry[2]
+
+        ast, symbol_table = compile_file(key)
+        with self.lock:
+            self.programs[key] = (stamp, ast, symbol_table)
+            self.programs.move_to_end(key)
+            while len(self.programs) > self.max_size:
+                self.programs.popitem(last=False)
+        return ast, symbol_table
+
+
+class OutputStream:
+    """Sortie de print envoyée au client au fil de l'eau.
+
+    Chaque envoi est une ligne JSON {'stdout': texte} ; la réponse se
+    termine par une ligne {'status': code}. Le texte est regroupé jusqu'à
+    FLUSH_SIZE caractères : la mémoire du démon reste bornée quelle que
+    soit la quantité de sortie du script.
+    """
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.pending = []
+        self.size = 0
+
+    def write(self, text):
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= FLUSH_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.send({'stdout': ''.join(self.pending)})
+            self.pending = []
+            self.size = 0
+
+    def send(self, frame):
+        self.wfile.write((json.dumps(frame) + '\n').encode('utf-8'))
+
+
+def run_request(request, cache, out, time_limit=None, client_gone=None):
+    """Exécute une requête {'cwd', 'argv'} en écrivant sur out ; renvoie le code de retour.
+
+    argv[0] est le script ; les arguments suivants sont transmis tels quels
+    mais le langage ne les expose pas encore. La sortie est vidée à chaque
+    vérification. L'exécution est interrompue après time_limit secondes,
+    ou dès que client_gone() renvoie True.
+    """
+    from .interpreter import Interpreter
+
+    argv = request.get('argv') or []
+    if not argv:
+        out.write("Erreur: aucun fichier indiqué.\n")
+        return 1
+
+    filepath = os.path.join(request.get('cwd') or '', argv[0])
+    try:
+        ast, symbol_table = cache.get(filepath)
+    except FileNotFoundError:
+        out.write("Erreur: Le fichier n'existe pas.\n")
+        return 1
+    except Exception as e:
+        out.write(f"\n Erreur d'analyse: {e}\n")
+        return 1
+
+    interpreter = Interpreter(symbol_table, out=out, yield_every=CHECK_EVERY)
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    try:
+        for _ in interpreter.iter_exec(ast):
+            out.flush()
+            if deadline is not None and time.monotonic() > deadline:
+                out.write(f"\n Erreur d'exécution: durée limite de {time_limit} s dépassée\n")
+                return 1
+            if client_gone is not None and client_gone():
+                return 1
+    except OSError:
+        # Écriture impossible : le client est parti
+        raise
+    except Exception as e:
+        out.write(f"\n Erreur d'exécution: {e}\n")
+        return 1
+    return 0
+
+
+def serve(socket_path=None, time_limit=TIME_LIMIT):
+    import select
+    import signal
+    import socketserver
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Erreur: le mode démon nécessite les sockets Unix.")
+        sys.exit(1)
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            print(f"Erreur: {socket_path} existe et n'est pas un socket")
+            sys.exit(1)
+        # Socket résiduel d'un démon arrêté, sauf si un démon y répond encore
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(socket_path)
+            print(f"Erreur: un démon écoute déjà sur {socket_path}")
+            sys.exit(1)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+
+    cache = ProgramCache()
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            out = OutputStream(self.wfile)
+            try:
+                status = run_request(request, cache, out, time_limit, self.client_gone)
+                out.flush()
+                out.send({'status': status})
+            except OSError:
+                # Client parti avant la fin : personne à qui répondre
+                pass
+
+        def client_gone(self):
+            # Le client n'envoie plus rien après sa requête : si le socket
+            # devient lisible, c'est qu'il a fermé la connexion (Ctrl+C)
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if not readable:
+                return False
+            try:
+                return self.connection.recv(1, socket.MSG_PEEK) == b''
+            except OSError:
+                return True
+
+    # Charge l'interpréteur une fois pour toutes
+    from . import interpreter  # noqa: F401
+
+    old_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    # SIGTERM passe par le même nettoyage que Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"Démon MiniPython à l'écoute sur {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def run_client(argv, socket_path=None):
+    request = {'cwd': os.getcwd(), 'argv': argv}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with sock.makefile('rb') as replies:
+            for line in replies:
+                if not line.endswith(b'\n'):
+                    break
+                frame = json.loads(line)
+                if 'status' in frame:
+                    return frame['status']
+                sys.stdout.write(frame['stdout'])
+                sys.stdout.flush()
+
+    # Fin de connexion sans code de retour : le démon s'est arrêté en cours de route
+    print("\n Erreur: le démon a interrompu l'exécution du script.")
+    return 1
+
+
+def client_main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if hasattr(socket, 'AF_UNIX'):
+        try:
+            return run_client(argv)
+        except KeyboardInterrupt:
+            # Fermer le socket suffit : le démon abandonne l'exécution
+            return 130
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+    # Pas de démon disponible : même exécution, dans ce processus
+    return run_request({'cwd': os.getcwd(), 'argv': argv}, ProgramCache(), sys.stdout)
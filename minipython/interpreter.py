@@ -1,7 +1,831 @@
 import sys
-from anytree import Node, RenderTree
-from anytree.exporter import DotExporter
+import os
 import re
+from collections import namedtuple
+
+token_specification = [
+    ('NUMBER', r'\d+'),
+    ('STRING_LIT', r'"(?:[^"\\\n]|\\.)*"'),
+    ('COMMENT', r'/\*.*?\*/'),
+    ('INT', r'int\b'),
+    ('FLOAT', r'float\b'),
+    ('BOOL', r'bool\b'),
+    ('STRING', r'string\b'),
+    ('WHILE', r'while\b'),
+    ('IF', r'if\b'),
+    ('ELSE', r'else\b'),
+    ('PRINT', r'print\b'),
+    ('DEF', r'def\b'),
+    ('RETURN', r'return\b'),
+    ('ID', r'[A-Za-z_]\w*'),
+    ('LTE', r'<='),
+    ('GTE', r'>='),
+    ('EQ', r'=='),
+    ('NEQ', r'!='),
+    ('LT', r'<'),
+    ('GT', r'>'),
+    ('AND', r'&&'),
+    ('OR', r'\|\|'),
+    ('NOT', r'!'),
+    ('COMMA', r','),
+    ('SEMICOLON', r';'),
+    ('PLUS', r'\+'),
+    ('MINUS', r'-'),
+    ('MULT', r'\*'),
+    ('DIV', r'/'),
+    ('EQUAL', r'='),
+    ('LPAR', r'\('),
+    ('RPAR', r'\)'),
+    ('LBRACE', r'\{'),
+    ('RBRACE', r'\}'),
+    ('LBRACKET', r'\['),
+    ('RBRACKET', r'\]'),
+    ('SKIP', r'[ \t\r\n]+')
+]
+
+regex = '|'.join(f'(?P<{n}>{p})' for n, p in token_specification)
+token_regex = re.compile(regex, re.DOTALL)
+
+Token = namedtuple('Token', ['type', 'value', 'line', 'column'])
+
+
+class LexicalError(SyntaxError):
+    """Caractère qui ne commence aucun token."""
+
+
+# Taille des blocs lus par iter_tokens sur un fichier (en caractères)
+CHUNK_SIZE = 1 << 20
+
+
+def iter_tokens(source):
+    """Produit les tokens un par un, sur une str ou sur un fichier texte lu par blocs.
+
+    Les deux cas passent par la même expression régulière sur des str :
+    le mode --stream reconnaît exactement le même langage que le mode
+    normal, et les colonnes sont comptées en caractères. Un token coupé
+    par la fin d'un bloc est relu une fois le bloc suivant ajouté.
+    Un caractère qui ne commence aucun token lève une LexicalError positionnée.
+    """
+    if isinstance(source, str):
+        chunks = iter([source])
+    else:
+        chunks = iter(lambda: source.read(CHUNK_SIZE), '')
+
+    # offset : position dans le fichier de buf[0] ; line_start aussi en absolu
+    buf, offset, pos, eof = '', 0, 0, False
+    line, line_start = 1, 0
+    while True:
+        m = token_regex.match(buf, pos)
+        if not eof:
+            if m is None:
+                # Seul un token qui ne tient pas sur la ligne peut encore se compléter
+                incomplete = buf.find('\n', pos) < 0
+            else:
+                incomplete = (m.end() == len(buf)
+                              or (m.lastgroup == 'DIV' and buf.startswith('/*', pos)))
+            if incomplete:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
+                else:
+                    buf = buf[pos:] + chunk
+                    offset += pos
+                    pos = 0
+                continue
+
+        if m is None:
+            if pos == len(buf):
+                return
+            column = offset + pos - line_start + 1
+            raise LexicalError(f"ligne {line}, colonne {column} : caractère inattendu {buf[pos]!r}")
+
+        text = m.group()
+        if m.lastgroup not in ['SKIP', 'COMMENT']:
+            yield Token(m.lastgroup, text, line, offset + m.start() - line_start + 1)
+        if '\n' in text:
+            line += text.count('\n')
+            line_start = offset + m.start() + text.rindex('\n') + 1
+        pos = m.end()
+
+
+def tokenize(code_source):
+    return list(iter_tokens(code_source))
+
+
+string_escapes = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '\\': '\\', '"': '"'}
+
+
+def decode_string_literal(lexeme):
+    """'"a\\tb"' -> 'a<tab>b'. Les échappements inconnus sont gardés tels quels."""
+    return re.sub(r'\\(.)', lambda m: string_escapes.get(m.group(1), m.group(0)), lexeme[1:-1])
+
+
+# Table de précédence unique des opérateurs : token -> (symbole, précédence).
+# Plus la précédence est haute, plus l'opérateur lie fort ; les opérateurs
+# binaires sont associatifs à gauche, les préfixes s'appliquent à un terme.
+binary_operators = {
+    'OR': ('||', 1),
+    'AND': ('&&', 2),
+    'EQ': ('==', 3), 'NEQ': ('!=', 3),
+    'LT': ('<', 4), 'GT': ('>', 4), 'LTE': ('<=', 4), 'GTE': ('>=', 4),
+    'PLUS': ('+', 5), 'MINUS': ('-', 5),
+    'MULT': ('*', 6), 'DIV': ('/', 6),
+}
+unary_operators = {'NOT': ('!', 7), 'MINUS': ('-', 7)}
+
+
+class Parser:
+    def __init__(self, tokens, symbol_table):
+        # tokens peut être une liste ou un itérateur : on ne garde qu'un token d'avance
+        self.tokens = iter(tokens)
+        self.symbol_table = symbol_table
+        self.lookahead = next(self.tokens, None)
+
+    def current_token(self):
+        return self.lookahead
+
+    def advance(self):
+        self.lookahead = next(self.tokens, None)
+
+    def error(self, expected):
+        tok = self.current_token()
+        if tok is None:
+            raise SyntaxError(f"fin de fichier inattendue alors qu'on attendait {expected}")
+        raise SyntaxError(f"ligne {tok.line}, colonne {tok.column} : '{tok.value}' trouvé alors qu'on attendait {expected}")
+
+    def expect(self, token_type, expected):
+        tok = self.current_token()
+        if not tok or tok[0] != token_type:
+            self.error(expected)
+        self.advance()
+        return tok
+
+    def parse_program(self):
+        return ('Program', list(self.iter_statements()))
+
+    def iter_statements(self):
+        while self.current_token() is not None:
+            stmt = self.parse_statement()
+            if stmt:
+                yield stmt
+
+    def parse_statement(self):
+        tok = self.current_token()
+        if not tok:
+            return None
+
+        if tok[0] in ['INT', 'FLOAT', 'BOOL', 'STRING']:
+            return self.parse_declaration()
+        elif tok[0] == 'WHILE':
+            return self.parse_while()
+        elif tok[0] == 'IF':
+            return self.parse_if()
+        elif tok[0] == 'PRINT':
+            return self.parse_print()
+        elif tok[0] == 'ID':
+            return self.parse_assignment()
+        elif tok[0] == 'SEMICOLON':
+            # Instruction vide
+            self.advance()
+            return None
+        self.error("une instruction")
+
+    def parse_declaration(self):
+        type_tok = self.current_token()
+        var_type = type_tok[1]
+        self.advance()
+
+        vars_list = []
+        while True:
+            var_name = self.expect('ID', "un nom de variable")[1]
+            vars_list.append(var_name)
+            self.symbol_table[var_name] = var_type
+            # Dimensions de tableau (T[10], M[2][3]) : acceptées, pas encore exécutées
+            while self.current_token() and self.current_token()[0] == 'LBRACKET':
+                self.advance()
+                self.expect('NUMBER', "la taille du tableau")
+                self.expect('RBRACKET', "']'")
+            if self.current_token() and self.current_token()[0] == 'COMMA':
+                self.advance()
+                continue
+            break
+        self.expect('SEMICOLON', "';'")
+
+        return ('Decl (L-attribué)', [('Var: ' + v + f' (type={var_type})') for v in vars_list])
+
+    def parse_assignment(self):
+        var_name = self.current_token()[1]
+        self.advance()
+        self.expect('EQUAL', "'='")
+        expr = self.parse_expression()
+        self.expect('SEMICOLON', "';'")
+        return ('Assign (S-attribué)', [('Var: ' + var_name), expr])
+
+    def parse_expression(self, min_precedence=1):
+        """Analyse par précédence d'opérateurs (Pratt), en une passe sans retour arrière.
+
+        Les opérateurs de même niveau sont consommés par la boucle, seuls les
+        niveaux plus prioritaires descendent en récursion : le temps reste
+        linéaire même sur de très longues expressions.
+        """
+        left = self.parse_term()
+
+        while self.current_token() and self.current_token()[0] in binary_operators:
+            op, precedence = binary_operators[self.current_token()[0]]
+            if precedence < min_precedence:
+                break
+            self.advance()
+            right = self.parse_expression(precedence + 1)
+            left = ('Expr: ' + op, [left, right])
+
+        return left
+
+    def parse_term(self):
+        tok = self.current_token()
+        if not tok:
+            self.error("une expression")
+
+        if tok[0] == 'NUMBER':
+            self.advance()
+            return ('Const: ' + tok[1])
+        elif tok[0] == 'STRING_LIT':
+            self.advance()
+            # Littéral internalisé à la compilation : une seule copie par valeur
+            return ('Str', sys.intern(decode_string_literal(tok[1])))
+        elif tok[0] == 'ID':
+            self.advance()
+            return ('Var: ' + tok[1])
+        elif tok[0] == 'LPAR':
+            self.advance()
+            expr = self.parse_expression()
+            self.expect('RPAR', "')'")
+            return expr
+        elif tok[0] in unary_operators:
+            op, precedence = unary_operators[tok[0]]
+            self.advance()
+            expr = self.parse_expression(precedence)
+            if op == '-' and isinstance(expr, str) and expr.startswith('Const: ') and expr[7:].isdigit():
+                return 'Const: -' + expr[7:]
+            return ('Expr: ' + op, [expr])
+        self.error("une expression")
+
+    def parse_block(self):
+        self.expect('LBRACE', "'{'")
+        body = []
+        while self.current_token() and self.current_token()[0] != 'RBRACE':
+            stmt = self.parse_statement()
+            if stmt:
+                body.append(stmt)
+        self.expect('RBRACE', "'}'")
+        return body
+
+    def parse_condition(self):
+        self.expect('LPAR', "'('")
+        condition = self.parse_expression()
+        self.expect('RPAR', "')'")
+        return condition
+
+    def parse_while(self):
+        self.advance()
+        condition = self.parse_condition()
+        body = self.parse_block()
+        return ('While (S-attribué)', [condition, ('Body', body)])
+
+    def parse_if(self):
+        self.advance()
+        condition = self.parse_condition()
+        then_body = self.parse_block()
+
+        else_body = []
+        if self.current_token() and self.current_token()[0] == 'ELSE':
+            self.advance()
+            else_body = self.parse_block()
+
+        if else_body:
+            return ('If (S-attribué)', [condition, ('Then', then_body), ('Else', else_body)])
+        else:
+            return ('If (S-attribué)', [condition, ('Then', then_body)])
+
+    def parse_print(self):
+        self.advance()
+        self.expect('LPAR', "'('")
+        expr = self.parse_expression()
+        self.expect('RPAR', "')'")
+        self.expect('SEMICOLON', "';'")
+        return ('Print (S-attribué)', [expr])
+
+
+# Analyse sémantique
+def semantic_check(node, symbol_table):
+    if isinstance(node, tuple):
+        node_type = node[0]
+
+        if node_type.startswith('Var:'):
+            var_name = node_type.split(': ')[1]
+            if var_name not in symbol_table:
+                raise Exception(f"Erreur sémantique : variable {var_name} non déclarée")
+
+        # La valeur d'un littéral 'Str' n'est pas un nœud
+        if len(node) > 1 and node_type != 'Str':
+            for child in node[1:]:
+                if isinstance(child, (tuple, list, str)):
+                    semantic_check(child, symbol_table)
+
+    elif isinstance(node, str):
+        # Feuilles 'Var: x' des expressions, 'Var: x (type=int)' des déclarations
+        if node.startswith('Var:'):
+            var_name = node.split(': ')[1].split(' ')[0]
+            if var_name not in symbol_table:
+                raise Exception(f"Erreur sémantique : variable {var_name} non déclarée")
+
+    elif isinstance(node, list):
+        for item in node:
+            semantic_check(item, symbol_table)
+
+    return node
+
+
+def build_anytree(node, parent=None):
+    # anytree ne sert qu'aux diagnostics : import paresseux pour un démarrage rapide
+    from anytree import Node
+
+    if isinstance(node, tuple):
+        n = Node(node[0], parent=parent)
+        if len(node) > 1:
+            for c in node[1:]:
+                if isinstance(c, (tuple, list)):
+                    build_anytree(c, n)
+                else:
+                    Node(str(c), parent=n)
+        return n
+    elif isinstance(node, list):
+        for item in node:
+            build_anytree(item, parent)
+        return parent
+    else:
+        Node(str(node), parent=parent)
+        return parent
+
+
+class TACGenerator:
+    op_map = {'+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV',
+              '<': 'LT', '>': 'GT', '<=': 'LTE', '>=': 'GTE',
+              '==': 'EQ', '!=': 'NEQ'}
+    # Comparaison contraire, pour sauter quand la condition est fausse
+    negated = {'LT': 'GTE', 'GTE': 'LT', 'GT': 'LTE', 'LTE': 'GT', 'EQ': 'NEQ', 'NEQ': 'EQ'}
+
+    def __init__(self):
+        self.code = []
+        self.temp_count = 0
+        self.label_count = 0
+        # Table des chaînes : littéral -> constante $k, partagée par toutes ses occurrences
+        self.strings = {}
+
+    def new_temp(self):
+        # '%' ne peut pas commencer un identificateur : pas de collision avec
+        # une variable du programme nommée t1, t2, ...
+        self.temp_count += 1
+        return f"%t{self.temp_count}"
+
+    def new_label(self):
+        self.label_count += 1
+        return f"L{self.label_count}"
+
+    def string_constant(self, value):
+        if value not in self.strings:
+            self.strings[value] = f"${len(self.strings) + 1}"
+        return self.strings[value]
+
+    def generate(self, node):
+        if isinstance(node, tuple):
+            node_type = node[0]
+
+            if node_type.startswith('Decl'):
+                for var in node[1]:
+                    var_name = var.split(': ')[1].split(' ')[0]
+                    self.code.append(f"DECLARE {var_name}")
+
+            elif node_type.startswith('Assign'):
+                if len(node) > 2:
+                    var = node[1][0].split(': ')[1]
+                    expr_node = node[2]
+                else:
+                    var = node[1][0].split(': ')[1]
+                    expr_node = node[1][1] if len(node[1]) > 1 else None
+
+                if expr_node is not None:
+                    result = self.generate_expr(expr_node)
+                    self.code.append(f"STORE {result}, {var}")
+                else:
+                    self.code.append(f"STORE None, {var}")
+
+            elif node_type.startswith('While'):
+                start_label = self.new_label()
+                end_label = self.new_label()
+
+                self.code.append(f"{start_label}:")
+                if isinstance(node[1], (list, tuple)) and len(node[1]) > 0:
+                    cond = node[1][0]
+                    body = node[1][1] if len(node[1]) > 1 else None
+                else:
+                    cond = node[1]
+                    body = node[2] if len(node) > 2 else None
+
+                self.generate_jump(cond, end_label, False)
+
+                if body is not None:
+                    self.generate(body)
+
+                self.code.append(f"GOTO {start_label}")
+                self.code.append(f"{end_label}:")
+
+            elif node_type.startswith('If'):
+                else_label = self.new_label()
+                end_label = self.new_label()
+                if isinstance(node[1], (list, tuple)) and len(node[1]) > 0:
+                    cond = node[1][0]
+                    then_block = node[1][1] if len(node[1]) > 1 else None
+                    else_block = node[1][2] if len(node[1]) > 2 else None
+                else:
+                    cond = node[1]
+                    then_block = node[2] if len(node) > 2 else None
+                    else_block = node[3] if len(node) > 3 else None
+
+                self.generate_jump(cond, else_label, False)
+
+                if then_block is not None:
+                    self.generate(then_block)
+                self.code.append(f"GOTO {end_label}")
+
+                self.code.append(f"{else_label}:")
+                if else_block is not None:
+                    self.generate(else_block)
+
+                self.code.append(f"{end_label}:")
+
+            elif node_type.startswith('Print'):
+                expr_node = node[1][0] if isinstance(node[1], (list, tuple)) and len(node[1])>0 else (node[1] if len(node)>1 else None)
+                result = self.generate_expr(expr_node)
+                self.code.append(f"PRINT {result}")
+
+            elif node_type == 'Program':
+                from .cfg import thread_jumps
+
+                for stmt in node[1]:
+                    self.generate(stmt)
+                self.code = thread_jumps(self.code)
+
+            elif node_type in ['Body', 'Then', 'Else']:
+                for stmt in node[1]:
+                    self.generate(stmt)
+
+        elif isinstance(node, list):
+            for item in node:
+                self.generate(item)
+
+    def generate_jump(self, expr, label, when):
+        """Code de branchement : saute à label si expr vaut when, sinon continue.
+
+        && et || sont court-circuités : l'opérande droit n'est évalué que si
+        le gauche ne suffit pas à décider. Les comparaisons deviennent un
+        saut conditionnel direct (IFLT a, b GOTO L) sans booléen temporaire.
+        """
+        if isinstance(expr, str):
+            expr = (expr,)
+        op = expr[0].split(': ')[1] if isinstance(expr, tuple) and expr[0].startswith('Expr:') else None
+
+        if op == '!':
+            self.generate_jump(expr[1][0], label, not when)
+        elif op in ['&&', '||']:
+            left, right = expr[1][0], expr[1][1]
+            if (op == '&&') != when:
+                # a && b faux dès que a est faux ; a || b vrai dès que a est vrai
+                self.generate_jump(left, label, when)
+                self.generate_jump(right, label, when)
+            else:
+                skip_label = self.new_label()
+                self.generate_jump(left, skip_label, not when)
+                self.generate_jump(right, label, when)
+                self.code.append(f"{skip_label}:")
+        elif op in ['<', '>', '<=', '>=', '==', '!=']:
+            left = self.generate_expr(expr[1][0])
+            right = self.generate_expr(expr[1][1])
+            tac_op = self.op_map[op] if when else self.negated[self.op_map[op]]
+            self.code.append(f"IF{tac_op} {left}, {right} GOTO {label}")
+        else:
+            result = self.generate_expr(expr)
+            self.code.append(f"{'IFTRUE' if when else 'IFFALSE'} {result} GOTO {label}")
+
+    def generate_expr(self, expr):
+        # Les feuilles 'Const: ...' / 'Var: ...' sont produites comme de simples chaînes
+        if isinstance(expr, str):
+            expr = (expr,)
+
+        if isinstance(expr, tuple):
+            expr_type = expr[0]
+
+            if expr_type.startswith('Const:'):
+                return expr_type.split(': ')[1]
+
+            elif expr_type == 'Str':
+                return self.string_constant(expr[1])
+
+            elif expr_type.startswith('Var:'):
+                var_name = expr_type.split(': ')[1]
+                temp = self.new_temp()
+                self.code.append(f"LOAD {var_name}, {temp}")
+                return temp
+
+            elif expr_type.startswith('Expr:'):
+                op = expr_type.split(': ')[1]
+
+                if op == '!':
+                    operand = self.generate_expr(expr[1][0])
+                    temp = self.new_temp()
+                    self.code.append(f"NOT {operand}, {temp}")
+                    return temp
+                elif op == '-' and len(expr[1]) == 1:
+                    operand = self.generate_expr(expr[1][0])
+                    temp = self.new_temp()
+                    self.code.append(f"NEG {operand}, {temp}")
+                    return temp
+                elif op in ['&&', '||']:
+                    # Valeur de a && b / a || b : a si a suffit à décider, sinon b
+                    left = self.generate_expr(expr[1][0])
+                    temp = self.new_temp()
+                    end_label = self.new_label()
+                    self.code.append(f"COPY {left}, {temp}")
+                    jump = 'IFFALSE' if op == '&&' else 'IFTRUE'
+                    self.code.append(f"{jump} {temp} GOTO {end_label}")
+                    right = self.generate_expr(expr[1][1])
+                    self.code.append(f"COPY {right}, {temp}")
+                    self.code.append(f"{end_label}:")
+                    return temp
+                else:
+                    left = self.generate_expr(expr[1][0])
+                    right = self.generate_expr(expr[1][1])
+                    temp = self.new_temp()
+
+                    tac_op = self.op_map.get(op, op)
+                    self.code.append(f"{tac_op} {left}, {right}, {temp}")
+                    return temp
+
+        return str(expr)
+
+
+class Rope:
+    """Chaîne construite par concaténations successives, sans coût quadratique.
+
+    Une concaténation crée un nœud (gauche, droite) en O(1), sans copier ni
+    modifier ses opérandes : ajouter au début, à la fin ou dériver une autre
+    chaîne laisse chaque version intacte. Le texte n'est assemblé qu'à la
+    première lecture, par un parcours itératif ; le nœud garde alors ce
+    texte et lâche ses fils.
+    """
+    __slots__ = ('left', 'right', 'length', 'flat')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat = None
+
+    def __str__(self):
+        if self.flat is None:
+            parts = []
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, str):
+                    parts.append(node)
+                elif node.flat is not None:
+                    parts.append(node.flat)
+                else:
+                    stack.append(node.right)
+                    stack.append(node.left)
+            self.flat = ''.join(parts)
+            self.left = self.right = None
+        return self.flat
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __len__(self):
+        return self.length
+
+
+def concat(left, right):
+    if not isinstance(left, Rope):
+        left = str(left)
+    if not isinstance(right, Rope):
+        right = str(right)
+    return Rope(left, right)
+
+
+def initial_value(var_type):
+    return '' if var_type == 'string' else 0
+
+
+class Interpreter:
+    def __init__(self, symbol_table, out=None, yield_every=None):
+        self.symbol_table = symbol_table
+        self.runtime = {var: initial_value(var_type) for var, var_type in symbol_table.items()}
+        self.out = out
+        # Nombre d'instructions / retours de boucle entre deux points de suspension
+        self.yield_every = yield_every
+        self.steps = 0
+
+    def eval_expr(self, expr):
+        if isinstance(expr, tuple):
+            expr_type = expr[0]
+            data = expr[1] if len(expr) > 1 else None
+        elif isinstance(expr, str):
+            expr_type = expr
+            data = None
+        elif isinstance(expr, (list,)) and len(expr) > 0:
+            return self.eval_expr(expr[0])
+        else:
+            return 0
+
+        if expr_type.startswith('Const:'):
+            return int(expr_type.split(': ')[1])
+        elif expr_type.startswith('Var:'):
+            var_name = expr_type.split(': ')[1]
+            if var_name in self.runtime:
+                return self.runtime[var_name]
+            if var_name in self.symbol_table:
+                # Variable déclarée mais pas encore affectée (mode streaming)
+                return initial_value(self.symbol_table[var_name])
+            raise Exception(f"variable {var_name} non déclarée")
+        elif expr_type == 'Str':
+            return data
+        elif expr_type.startswith('Expr:'):
+            op = expr_type.split(': ')[1]
+            if op == '!':
+                operand = self.eval_expr(data[0])
+                return not operand
+            elif op == '-' and len(data) == 1:
+                return -self.eval_expr(data[0])
+            left = self.eval_expr(data[0])
+            # Court-circuit : l'opérande droit n'est évalué que si nécessaire
+            if op == '&&':
+                return left and self.eval_expr(data[1])
+            elif op == '||':
+                return left or self.eval_expr(data[1])
+            right = self.eval_expr(data[1])
+
+            if op == '+' and (isinstance(left, (str, Rope)) or isinstance(right, (str, Rope))):
+                return concat(left, right)
+            # Les autres opérateurs travaillent sur la chaîne à plat
+            if isinstance(left, Rope):
+                left = str(left)
+            if isinstance(right, Rope):
+                right = str(right)
+
+            if op == '+':
+                return left + right
+            elif op == '-':
+                return left - right
+            elif op == '*':
+                return left * right
+            elif op == '/':
+                return left // right if right != 0 else 0
+            elif op == '<':
+                return left < right
+            elif op == '>':
+                return left > right
+            elif op == '<=':
+                return left <= right
+            elif op == '>=':
+                return left >= right
+            elif op == '==':
+                return left == right
+            elif op == '!=':
+                return left != right
+
+        return 0
+
+    def tick(self):
+        """Compte un pas d'exécution ; True quand il faut rendre la main."""
+        self.steps += 1
+        if self.steps >= self.yield_every:
+            self.steps = 0
+            return True
+        return False
+
+    def exec_stmt(self, stmt):
+        for _ in self.iter_exec(stmt):
+            pass
+
+    def iter_exec(self, stmt):
+        """Exécute stmt en générateur : produit None à chaque point de suspension."""
+        if isinstance(stmt, tuple):
+            stmt_type = stmt[0]
+
+            if stmt_type.startswith('Assign'):
+                if len(stmt) > 2:
+                    var = stmt[1][0].split(': ')[1]
+                    expr_node = stmt[2]
+                else:
+                    var = stmt[1][0].split(': ')[1]
+                    expr_node = stmt[1][1] if len(stmt[1]) > 1 else None
+
+                value = self.eval_expr(expr_node) if expr_node is not None else 0
+                self.runtime[var] = value
+                if self.yield_every and self.tick():
+                    yield
+
+            elif stmt_type.startswith('While'):
+                if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0:
+                    cond = stmt[1][0]
+                    body = stmt[1][1] if len(stmt[1])>1 else None
+                else:
+                    cond = stmt[1]
+                    body = stmt[2] if len(stmt)>2 else None
+
+                while self.eval_expr(cond):
+                    if body is not None:
+                        yield from self.iter_exec(body)
+                    # Retour arrière de la boucle : point de suspension coopératif
+                    if self.yield_every and self.tick():
+                        yield
+
+            elif stmt_type.startswith('If'):
+                if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0:
+                    cond = stmt[1][0]
+                    then_b = stmt[1][1] if len(stmt[1])>1 else None
+                    else_b = stmt[1][2] if len(stmt[1])>2 else None
+                else:
+                    cond = stmt[1]
+                    then_b = stmt[2] if len(stmt)>2 else None
+                    else_b = stmt[3] if len(stmt)>3 else None
+
+                if self.eval_expr(cond):
+                    if then_b is not None:
+                        yield from self.iter_exec(then_b)
+                elif else_b is not None:
+                    yield from self.iter_exec(else_b)
+
+            elif stmt_type.startswith('Print'):
+                expr_node = stmt[1][0] if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0 else (stmt[1] if len(stmt)>1 else None)
+                value = self.eval_expr(expr_node)
+                print(value, file=self.out)
+                if self.yield_every and self.tick():
+                    yield
+
+            elif stmt_type in ['Body', 'Then', 'Else']:
+                for s in stmt[1]:
+                    yield from self.iter_exec(s)
+
+            elif stmt_type == 'Program':
+                for s in stmt[1]:
+                    yield from self.iter_exec(s)
+
+
+def execute(ast, symbol_table):
+    Interpreter(symbol_table).exec_stmt(ast)
+
+
+def compile_source(code_source):
+    """Analyse et vérifie du code source ; renvoie (ast, symbol_table).
+
+    Les erreurs sont levées en exception.
+    """
+    symbol_table = {}
+    ast = Parser(iter_tokens(code_source), symbol_table).parse_program()
+    semantic_check(ast, symbol_table)
+    return ast, symbol_table
+
+
+def compile_file(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return compile_source(f.read())
+
+
+async def run_async(program, yield_every=1000, out=None):
+    """Exécute un programme MiniPython sans bloquer la boucle asyncio.
+
+    program est le code source (str). L'interpréteur rend la main à la
+    boucle toutes les yield_every instructions ou retours de boucle, ce qui
+    permet d'annuler la tâche et de faire tourner plusieurs scripts en
+    parallèle. L'analyse du source se fait dans l'exécuteur par défaut de
+    la boucle, pour qu'un gros programme ne la bloque pas non plus.
+    out est le fichier de sortie de print (sys.stdout par défaut).
+    Les erreurs sont levées en exception. Renvoie l'état final des variables.
+    """
+    import asyncio
+
+    if yield_every < 1:
+        raise ValueError("yield_every doit être >= 1")
+
+    loop = asyncio.get_running_loop()
+    ast, symbol_table = await loop.run_in_executor(None, compile_source, program)
+    interpreter = Interpreter(symbol_table, out=out, yield_every=yield_every)
+    for _ in interpreter.iter_exec(ast):
+        await asyncio.sleep(0)
+    return {var: str(value) if isinstance(value, Rope) else value
+            for var, value in interpreter.runtime.items()}
+
 
 def run_minipython_file(filepath):
     try:
@@ -17,285 +841,38 @@ def run_minipython_file(filepath):
     if not code_source.strip():
         print("Aucun code dans le fichier. Programme terminé.")
         sys.exit(0)
-    
+
     print("=== Code source ===")
     print(code_source)
 
-    token_specification = [
-        ('NUMBER', r'\d+'),
-        ('INT', r'int'),
-        ('FLOAT', r'float'),
-        ('BOOL', r'bool'),
-        ('STRING', r'string'),
-        ('WHILE', r'while'),
-        ('IF', r'if'),
-        ('ELSE', r'else'),
-        ('PRINT', r'print'),
-        ('DEF', r'def'),
-        ('RETURN', r'return'),
-        ('ID', r'[A-Za-z_]\w*'),
-        ('LTE', r'<='),
-        ('GTE', r'>='),
-        ('EQ', r'=='),
-        ('NEQ', r'!='),
-        ('LT', r'<'),
-        ('GT', r'>'),
-        ('AND', r'&&'),
-        ('OR', r'\|\|'),
-        ('NOT', r'!'),
-        ('COMMA', r','),
-        ('SEMICOLON', r';'),
-        ('PLUS', r'\+'),
-        ('MINUS', r'-'),
-        ('MULT', r'\*'),
-        ('DIV', r'/'),
-        ('EQUAL', r'='),
-        ('LPAR', r'\('),
-        ('RPAR', r'\)'),
-        ('LBRACE', r'\{'),
-        ('RBRACE', r'\}'),
-        ('LBRACKET', r'\['),
-        ('RBRACKET', r'\]'),
-        ('SKIP', r'[ \t\n]+'),
-        ('COMMENT', r'/\*.*?\*/')
-    ]
-
-    regex = '|'.join(f'(?P<{n}>{p})' for n, p in token_specification)
-    tokens = [(m.lastgroup, m.group()) for m in re.finditer(regex, code_source, re.DOTALL) 
-              if m.lastgroup not in ['SKIP', 'COMMENT']]
+    try:
+        tokens = tokenize(code_source)
+    except LexicalError as e:
+        print(f"\n Erreur d'analyse lexicale: {e}")
+        sys.exit(1)
 
     print("\n=== Phase lexicale ===")
     for t in tokens:
-        print(t)
+        print((t.type, t.value))
 
     symbol_table = {}
 
-    class Parser:
-        def __init__(self, tokens):
-            self.tokens = tokens
-            self.pos = 0
-            
-        def current_token(self):
-            if self.pos < len(self.tokens):
-                return self.tokens[self.pos]
-            return None
-        
-        def advance(self):
-            self.pos += 1
-        
-        def parse_program(self):
-            statements = []
-            while self.pos < len(self.tokens):
-                stmt = self.parse_statement()
-                if stmt:
-                    statements.append(stmt)
-            return ('Program', statements)
-        
-        def parse_statement(self):
-            tok = self.current_token()
-            if not tok:
-                return None
-                
-            if tok[0] in ['INT', 'FLOAT', 'BOOL', 'STRING']:
-                return self.parse_declaration()
-            elif tok[0] == 'WHILE':
-                return self.parse_while()
-            elif tok[0] == 'IF':
-                return self.parse_if()
-            elif tok[0] == 'PRINT':
-                return self.parse_print()
-            elif tok[0] == 'ID':
-                return self.parse_assignment()
-            else:
-                self.advance()
-                return None
-        
-        def parse_declaration(self):
-            type_tok = self.current_token()
-            var_type = type_tok[1]
-            self.advance()
-            
-            vars_list = []
-            while self.current_token() and self.current_token()[0] != 'SEMICOLON':
-                if self.current_token()[0] == 'ID':
-                    var_name = self.current_token()[1]
-                    vars_list.append(var_name)
-                    symbol_table[var_name] = var_type
-                self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'SEMICOLON':
-                self.advance()
-            
-            return ('Decl (L-attribué)', [('Var: ' + v + f' (type={var_type})') for v in vars_list])
-        
-        def parse_assignment(self):
-            var_name = self.current_token()[1]
-            self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'EQUAL':
-                self.advance()
-                expr = self.parse_expression()
-                
-                if self.current_token() and self.current_token()[0] == 'SEMICOLON':
-                    self.advance()
-                
-                return ('Assign (S-attribué)', [('Var: ' + var_name), expr])
-            return None
-        
-        def parse_expression(self):
-            left = self.parse_term()
-            
-            while self.current_token() and self.current_token()[0] in ['PLUS', 'MINUS', 'LT', 'GT', 'LTE', 'GTE', 'EQ', 'NEQ', 'AND', 'OR']:
-                op = self.current_token()[1]
-                self.advance()
-                right = self.parse_term()
-                left = ('Expr: ' + op, [left, right])
-            
-            return left
-        
-        def parse_term(self):
-            tok = self.current_token()
-            if not tok:
-                return None
-            
-            if tok[0] == 'NUMBER':
-                self.advance()
-                return ('Const: ' + tok[1])
-            elif tok[0] == 'ID':
-                self.advance()
-                return ('Var: ' + tok[1])
-            elif tok[0] == 'LPAR':
-                self.advance()
-                expr = self.parse_expression()
-                if self.current_token() and self.current_token()[0] == 'RPAR':
-                    self.advance()
-                return expr
-            elif tok[0] == 'NOT':
-                self.advance()
-                expr = self.parse_term()
-                return ('Expr: !', [expr])
-            return None
-        
-        def parse_while(self):
-            self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'LPAR':
-                self.advance()
-            
-            condition = self.parse_expression()
-            
-            if self.current_token() and self.current_token()[0] == 'RPAR':
-                self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'LBRACE':
-                self.advance()
-            
-            body = []
-            while self.current_token() and self.current_token()[0] != 'RBRACE':
-                stmt = self.parse_statement()
-                if stmt:
-                    body.append(stmt)
-            
-            if self.current_token() and self.current_token()[0] == 'RBRACE':
-                self.advance()
-            
-            return ('While (S-attribué)', [condition, ('Body', body)])
-        
-        def parse_if(self):
-            self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'LPAR':
-                self.advance()
-            
-            condition = self.parse_expression()
-            
-            if self.current_token() and self.current_token()[0] == 'RPAR':
-                self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'LBRACE':
-                self.advance()
-            
-            then_body = []
-            while self.current_token() and self.current_token()[0] != 'RBRACE':
-                stmt = self.parse_statement()
-                if stmt:
-                    then_body.append(stmt)
-            
-            if self.current_token() and self.current_token()[0] == 'RBRACE':
-                self.advance()
-            
-            else_body = []
-            if self.current_token() and self.current_token()[0] == 'ELSE':
-                self.advance()
-                if self.current_token() and self.current_token()[0] == 'LBRACE':
-                    self.advance()
-                
-                while self.current_token() and self.current_token()[0] != 'RBRACE':
-                    stmt = self.parse_statement()
-                    if stmt:
-                        else_body.append(stmt)
-                
-                if self.current_token() and self.current_token()[0] == 'RBRACE':
-                    self.advance()
-            
-            if else_body:
-                return ('If (S-attribué)', [condition, ('Then', then_body), ('Else', else_body)])
-            else:
-                return ('If (S-attribué)', [condition, ('Then', then_body)])
-        
-        def parse_print(self):
-            self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'LPAR':
-                self.advance()
-            
-            expr = self.parse_expression()
-            
-            if self.current_token() and self.current_token()[0] == 'RPAR':
-                self.advance()
-            
-            if self.current_token() and self.current_token()[0] == 'SEMICOLON':
-                self.advance()
-            
-            return ('Print (S-attribué)', [expr])
-
     try:
-        parser = Parser(tokens)
+        parser = Parser(tokens, symbol_table)
         ast = parser.parse_program()
-        
+
         print("\n=== AST syntaxique brut ===")
         print(ast)
     except Exception as e:
         print(f"\n Erreur d'analyse syntaxique: {e}")
         sys.exit(1)
 
-    # Analyse sémantique
-    def semantic_check(node, symbol_table):
-        if isinstance(node, tuple):
-            node_type = node[0]
-            
-            if node_type.startswith('Var:'):
-                var_name = node_type.split(': ')[1]
-                if var_name not in symbol_table:
-                    raise Exception(f"Erreur sémantique : variable {var_name} non déclarée")
-            
-            if len(node) > 1:
-                for child in node[1:]:
-                    if isinstance(child, (tuple, list)):
-                        semantic_check(child, symbol_table)
-        
-        elif isinstance(node, list):
-            for item in node:
-                semantic_check(item, symbol_table)
-        
-        return node
-
     try:
         ast_semantic = semantic_check(ast, symbol_table)
         print("\n=== AST après analyse sémantique ===")
         print(ast_semantic)
         print("\nAnalyse sémantique réussie!")
-        
+
         print("\n=== Table des symboles ===")
         for var, var_type in symbol_table.items():
             print(f"{var}: {var_type}")
@@ -303,23 +880,8 @@ def run_minipython_file(filepath):
         print(f"\n {e}")
         sys.exit(1)
 
-    def build_anytree(node, parent=None):
-        if isinstance(node, tuple):
-            n = Node(node[0], parent=parent)
-            if len(node) > 1:
-                for c in node[1:]:
-                    if isinstance(c, (tuple, list)):
-                        build_anytree(c, n)
-                    else:
-                        Node(str(c), parent=n)
-            return n
-        elif isinstance(node, list):
-            for item in node:
-                build_anytree(item, parent)
-            return parent
-        else:
-            Node(str(node), parent=parent)
-            return parent
+    from anytree import RenderTree
+    from anytree.exporter import DotExporter
 
     root_node = build_anytree(ast_semantic)
     print("\n=== AST visuel console ===")
@@ -342,142 +904,6 @@ def run_minipython_file(filepath):
     except subprocess.CalledProcessError as e:
         print(f"\n⚠️ Impossible d'exporter l'image: {e}")
 
-    class TACGenerator:
-        def __init__(self):
-            self.code = []
-            self.temp_count = 0
-            self.label_count = 0
-        
-        def new_temp(self):
-            self.temp_count += 1
-            return f"t{self.temp_count}"
-        
-        def new_label(self):
-            self.label_count += 1
-            return f"L{self.label_count}"
-        
-        def generate(self, node):
-            if isinstance(node, tuple):
-                node_type = node[0]
-                
-                if node_type.startswith('Decl'):
-                    for var in node[1]:
-                        var_name = var.split(': ')[1].split(' ')[0]
-                        self.code.append(f"DECLARE {var_name}")
-                
-                elif node_type.startswith('Assign'):
-                    if len(node) > 2:
-                        var = node[1][0].split(': ')[1]
-                        expr_node = node[2]
-                    else:
-                        var = node[1][0].split(': ')[1]
-                        expr_node = node[1][1] if len(node[1]) > 1 else None
-
-                    if expr_node is not None:
-                        result = self.generate_expr(expr_node)
-                        self.code.append(f"STORE {result}, {var}")
-                    else:
-                        self.code.append(f"STORE None, {var}")
-                
-                elif node_type.startswith('While'):
-                    start_label = self.new_label()
-                    end_label = self.new_label()
-                    
-                    self.code.append(f"{start_label}:")
-                    if isinstance(node[1], (list, tuple)) and len(node[1]) > 0:
-                        cond = node[1][0]
-                        body = node[1][1] if len(node[1]) > 1 else None
-                    else:
-                        cond = node[1]
-                        body = node[2] if len(node) > 2 else None
-
-                    cond_result = self.generate_expr(cond)
-                    self.code.append(f"IFFALSE {cond_result} GOTO {end_label}")
-
-                    if body is not None:
-                        self.generate(body)
-                    
-                    self.code.append(f"GOTO {start_label}")
-                    self.code.append(f"{end_label}:")
-                
-                elif node_type.startswith('If'):
-                    else_label = self.new_label()
-                    end_label = self.new_label()
-                    if isinstance(node[1], (list, tuple)) and len(node[1]) > 0:
-                        cond = node[1][0]
-                        then_block = node[1][1] if len(node[1]) > 1 else None
-                        else_block = node[1][2] if len(node[1]) > 2 else None
-                    else:
-                        cond = node[1]
-                        then_block = node[2] if len(node) > 2 else None
-                        else_block = node[3] if len(node) > 3 else None
-
-                    cond_result = self.generate_expr(cond)
-                    self.code.append(f"IFFALSE {cond_result} GOTO {else_label}")
-
-                    if then_block is not None:
-                        self.generate(then_block)
-                    self.code.append(f"GOTO {end_label}")
-
-                    self.code.append(f"{else_label}:")
-                    if else_block is not None:
-                        self.generate(else_block)
-
-                    self.code.append(f"{end_label}:")
-                
-                elif node_type.startswith('Print'):
-                    expr_node = node[1][0] if isinstance(node[1], (list, tuple)) and len(node[1])>0 else (node[1] if len(node)>1 else None)
-                    result = self.generate_expr(expr_node)
-                    self.code.append(f"PRINT {result}")
-                
-                elif node_type == 'Program':
-                    for stmt in node[1]:
-                        self.generate(stmt)
-                
-                elif node_type in ['Body', 'Then', 'Else']:
-                    for stmt in node[1]:
-                        self.generate(stmt)
-            
-            elif isinstance(node, list):
-                for item in node:
-                    self.generate(item)
-        
-        def generate_expr(self, expr):
-            if isinstance(expr, tuple):
-                expr_type = expr[0]
-                
-                if expr_type.startswith('Const:'):
-                    return expr_type.split(': ')[1]
-                
-                elif expr_type.startswith('Var:'):
-                    var_name = expr_type.split(': ')[1]
-                    temp = self.new_temp()
-                    self.code.append(f"LOAD {var_name}, {temp}")
-                    return temp
-                
-                elif expr_type.startswith('Expr:'):
-                    op = expr_type.split(': ')[1]
-                    
-                    if op == '!':
-                        operand = self.generate_expr(expr[1][0])
-                        temp = self.new_temp()
-                        self.code.append(f"NOT {operand}, {temp}")
-                        return temp
-                    else:
-                        left = self.generate_expr(expr[1][0])
-                        right = self.generate_expr(expr[1][1])
-                        temp = self.new_temp()
-                        
-                        op_map = {'+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV',
-                                  '<': 'LT', '>': 'GT', '<=': 'LTE', '>=': 'GTE',
-                                  '==': 'EQ', '!=': 'NEQ', '&&': 'AND', '||': 'OR'}
-                        
-                        tac_op = op_map.get(op, op)
-                        self.code.append(f"{tac_op} {left}, {right}, {temp}")
-                        return temp
-            
-            return str(expr)
-
     tac_gen = TACGenerator()
     tac_gen.generate(ast_semantic)
 
@@ -485,118 +911,27 @@ def run_minipython_file(filepath):
     for line in tac_gen.code:
         print(line)
 
-    def execute(ast, symbol_table):
-        runtime = {var: 0 for var in symbol_table.keys()}
-        
-        def eval_expr(expr):
-            if isinstance(expr, tuple):
-                expr_type = expr[0]
-                data = expr[1] if len(expr) > 1 else None
-            elif isinstance(expr, str):
-                expr_type = expr
-                data = None
-            elif isinstance(expr, (list,)) and len(expr) > 0:
-                return eval_expr(expr[0])
-            else:
-                return 0
+    if tac_gen.strings:
+        print("\n=== Table des chaînes ===")
+        for value, name in tac_gen.strings.items():
+            print(f"{name} = {value!r}")
 
-            if expr_type.startswith('Const:'):
-                return int(expr_type.split(': ')[1])
-            elif expr_type.startswith('Var:'):
-                var_name = expr_type.split(': ')[1]
-                return runtime.get(var_name, 0)
-            elif expr_type.startswith('Expr:'):
-                op = expr_type.split(': ')[1]
-                if op == '!':
-                    operand = eval_expr(data[0])
-                    return not operand
-                left = eval_expr(data[0])
-                right = eval_expr(data[1])
-
-                if op == '+':
-                    return left + right
-                elif op == '-':
-                    return left - right
-                elif op == '*':
-                    return left * right
-                elif op == '/':
-                    return left // right if right != 0 else 0
-                elif op == '<':
-                    return left < right
-                elif op == '>':
-                    return left > right
-                elif op == '<=':
-                    return left <= right
-                elif op == '>=':
-                    return left >= right
-                elif op == '==':
-                    return left == right
-                elif op == '!=':
-                    return left != right
-                elif op == '&&':
-                    return left and right
-                elif op == '||':
-                    return left or right
+    from .cfg import build_cfg
+    from .ssa import to_ssa
+    from .regalloc import allocate_registers, NUM_REGISTERS
 
-            return 0
-        
-        def exec_stmt(stmt):
-            if isinstance(stmt, tuple):
-                stmt_type = stmt[0]
-                
-                if stmt_type.startswith('Assign'):
-                    if len(stmt) > 2:
-                        var = stmt[1][0].split(': ')[1]
-                        expr_node = stmt[2]
-                    else:
-                        var = stmt[1][0].split(': ')[1]
-                        expr_node = stmt[1][1] if len(stmt[1]) > 1 else None
-
-                    value = eval_expr(expr_node) if expr_node is not None else 0
-                    runtime[var] = value
-                
-                elif stmt_type.startswith('While'):
-                    if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0:
-                        cond = stmt[1][0]
-                        body = stmt[1][1] if len(stmt[1])>1 else None
-                    else:
-                        cond = stmt[1]
-                        body = stmt[2] if len(stmt)>2 else None
-
-                    while eval_expr(cond):
-                        if body is not None:
-                            exec_stmt(body)
-                
-                elif stmt_type.startswith('If'):
-                    if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0:
-                        cond = stmt[1][0]
-                        then_b = stmt[1][1] if len(stmt[1])>1 else None
-                        else_b = stmt[1][2] if len(stmt[1])>2 else None
-                    else:
-                        cond = stmt[1]
-                        then_b = stmt[2] if len(stmt)>2 else None
-                        else_b = stmt[3] if len(stmt)>3 else None
-
-                    if eval_expr(cond):
-                        if then_b is not None:
-                            exec_stmt(then_b)
-                    elif else_b is not None:
-                        exec_stmt(else_b)
-                
-                elif stmt_type.startswith('Print'):
-                    expr_node = stmt[1][0] if isinstance(stmt[1], (list, tuple)) and len(stmt[1])>0 else (stmt[1] if len(stmt)>1 else None)
-                    value = eval_expr(expr_node)
-                    print(value)
-                
-                elif stmt_type in ['Body', 'Then', 'Else']:
-                    for s in stmt[1]:
-                        exec_stmt(s)
-                
-                elif stmt_type == 'Program':
-                    for s in stmt[1]:
-                        exec_stmt(s)
-        
-        exec_stmt(ast)
+    ssa_cfg = to_ssa(build_cfg(tac_gen.code))
+    print("\n=== Forme SSA ===")
+    for line in ssa_cfg.code():
+        print(line)
+
+    assignment, allocated_code = allocate_registers(ssa_cfg)
+    print(f"\n=== TAC après allocation de registres ({NUM_REGISTERS} registres) ===")
+    for line in allocated_code:
+        print(line)
+    registers = {loc for loc in assignment.values() if loc.startswith('r')}
+    spilled = len(assignment) - sum(1 for loc in assignment.values() if loc.startswith('r'))
+    print(f"\n{len(assignment)} temporaires -> {len(registers)} registres, {spilled} en mémoire")
 
     print("\n=== Exécution MiniPython ===")
     try:
@@ -606,16 +941,90 @@ def run_minipython_file(filepath):
         print(f"\n Erreur d'exécution: {e}")
 
 
+def run_minipython_stream(filepath):
+    """Exécute le fichier instruction par instruction, sans le charger en mémoire.
+
+    Le fichier est lu et tokenisé par blocs, paresseusement ; chaque
+    instruction de premier niveau est analysée, vérifiée, exécutée puis
+    oubliée. La mémoire reste bornée par la plus grande instruction.
+    """
+    try:
+        f = open(filepath, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        print(f"Erreur: Le fichier n'existe pas.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Erreur lors de la lecture du fichier {e}")
+        sys.exit(1)
+
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            print("Aucun code dans le fichier. Programme terminé.")
+            sys.exit(0)
+
+        symbol_table = {}
+        tokens = iter_tokens(f)
+        parser = None
+        interpreter = Interpreter(symbol_table)
+        error = None
+
+        while error is None:
+            try:
+                if parser is None:
+                    # Le parseur lit un token d'avance : le premier peut déjà être invalide
+                    parser = Parser(tokens, symbol_table)
+                stmt = next(parser.iter_statements(), None)
+            except LexicalError as e:
+                error = f"\n Erreur d'analyse lexicale: {e}"
+                break
+            except Exception as e:
+                error = f"\n Erreur d'analyse syntaxique: {e}"
+                break
+            if stmt is None:
+                break
+
+            try:
+                semantic_check(stmt, symbol_table)
+            except Exception as e:
+                error = f"\n {e}"
+                break
+
+            try:
+                interpreter.exec_stmt(stmt)
+            except Exception as e:
+                error = f"\n Erreur d'exécution: {e}"
+
+    if error is not None:
+        print(error)
+        sys.exit(1)
+
 
 def main():
-    filename = sys.argv[1]
-    
+    args = sys.argv[1:]
+    if '--daemon' in args:
+        from .daemon import serve
+        args.remove('--daemon')
+        serve(args[0] if args else None)
+        return
+    if '--client' in args:
+        from .daemon import client_main
+        args.remove('--client')
+        sys.exit(client_main(args))
+
+    stream = '--stream' in args
+    if stream:
+        args.remove('--stream')
+    filename = args[0]
+
     try:
-        run_minipython_file(filename)
+        if stream:
+            run_minipython_stream(filename)
+        else:
+            run_minipython_file(filename)
     except Exception as e:
         print(f"\n Erreur: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
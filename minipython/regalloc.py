@@ -0,0 +1,369 @@
+"""Allocation de registres par balayage linéaire (linear scan).
+
+Les variables du programme restent en mémoire (LOAD/STORE) ; seules les
+temporaires sont placées dans un petit jeu fixe de registres `r0..rN`.
+Quand il n'y en a plus assez, la temporaire vivante le plus longtemps est
+envoyée dans une case mémoire `m0, m1, ...` (Poletto et Sarkar).
+
+L'allocation se fait sur la forme SSA : chaque version d'une temporaire a
+son propre intervalle. La sortie de SSA vient ensuite : chaque PHI devient
+des copies entre les emplacements de ses opérandes et celui de sa
+destination, et le TAC obtenu ne contient plus aucun PHI.
+"""
+from .cfg import JUMP_TARGET, decode, encode, defs_uses, operand_roles, liveness
+
+NUM_REGISTERS = 8
+
+# Préfixe des temporaires du générateur de TAC, absent des identificateurs
+TEMP_PREFIX = '%'
+
+
+def temporaries(cfg):
+    """Temporaires du code (`%t1`, ou `%t1.2` en SSA), par opposition aux variables."""
+    temps = set()
+    for instr in cfg.code():
+        defs, uses = defs_uses(*decode(instr))
+        temps.update(name for name in defs + uses if name.startswith(TEMP_PREFIX))
+    return temps
+
+
+def live_intervals(cfg, names):
+    """Intervalle [début, fin] de vie de chaque nom, sur la numérotation linéaire.
+
+    L'instruction i lit ses opérandes en 2*i et écrit sa destination en
+    2*i + 1 : une destination peut donc réutiliser le registre d'un
+    opérande lu pour la dernière fois par la même instruction. Les
+    opérandes d'un PHI sont lus en fin de prédécesseur, et les
+    destinations des PHI écrites en début de bloc, d'après la vivacité.
+    """
+    live_in, live_out = liveness(cfg)
+    intervals = {}
+
+    def extend(name, pos):
+        if name in names:
+            start, end = intervals.get(name, (pos, pos))
+            intervals[name] = (min(start, pos), max(end, pos))
+
+    i = 0
+    for block in cfg.blocks:
+        first = i
+        for instr in block.instrs:
+            op, args = decode(instr)
+            for arg, role in zip(args, operand_roles(op, args)):
+                if role == 'use' and op != 'PHI':
+                    extend(arg, 2 * i)
+                elif role == 'def':
+                    extend(arg, 2 * i + 1)
+            i += 1
+        last = max(i - 1, first)
+        for name in live_in[block.index]:
+            extend(name, 2 * first)
+        for name in live_out[block.index]:
+            extend(name, 2 * last + 1)
+    return intervals
+
+
+def linear_scan(intervals, num_registers=NUM_REGISTERS):
+    """Associe chaque nom à un registre `rK` ou à une case mémoire `mK`."""
+    assignment = {}
+    free = [f"r{k}" for k in reversed(range(num_registers))]
+    active = []
+    spill_count = 0
+
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: item[1]):
+        for other in list(active):
+            if intervals[other][1] < start:
+                active.remove(other)
+                free.append(assignment[other])
+
+        if free:
+            assignment[name] = free.pop()
+            active.append(name)
+        else:
+            # Plus de registre libre : on vide celui qui reste vivant le plus longtemps
+            victim = max(active, key=lambda n: intervals[n][1])
+            if intervals[victim][1] > end:
+                assignment[name] = assignment[victim]
+                active.remove(victim)
+                active.append(name)
+                assignment[victim] = f"m{spill_count}"
+            else:
+                assignment[name] = f"m{spill_count}"
+            spill_count += 1
+    return assignment
+
+
+def parallel_copy(moves, scratch):
+    """Suite de COPY équivalente aux copies simultanées moves [(source, destination)].
+
+    Une copie part dès que sa destination n'est plus lue par une autre ; un
+    cycle (r0 <-> r1) est rompu en passant par la case scratch.
+    """
+    moves = [(src, dst) for src, dst in moves if src != dst]
+    code = []
+    while moves:
+        sources = {src for src, _ in moves}
+        for i, (src, dst) in enumerate(moves):
+            if dst not in sources:
+                code.append(encode('COPY', [src, dst]))
+                del moves[i]
+                break
+        else:
+            src = moves[0][0]
+            code.append(encode('COPY', [src, scratch]))
+            moves = [(scratch if s == src else s, d) for s, d in moves]
+    return code
+
+
+def out_of_ssa(cfg, assignment):
+    """Réécrit un CFG en SSA avec les emplacements de assignment ; renvoie le TAC sans PHI.
+
+    Sur chaque arc entrant, un PHI devient une copie de l'emplacement de
+    l'opérande vers celui de sa destination, placée en fin de
+    prédécesseur. Un arc critique (prédécesseur à plusieurs successeurs)
+    est coupé par un bloc qui ne contient que ces copies. Les variables,
+    restées en mémoire, reprennent leur nom d'origine : leurs PHI
+    disparaissent donc sans copie.
+    """
+    def location(name):
+        return assignment[name] if name in assignment else name.split('.')[0]
+
+    copies = {}
+    for block in cfg.blocks:
+        for instr in block.instrs:
+            op, args = decode(instr)
+            if op == 'PHI':
+                for pred, arg in zip(block.preds, args[:-1]):
+                    copies.setdefault((pred, block.index), []).append((location(arg), location(args[-1])))
+
+    spills = sum(1 for loc in assignment.values() if loc.startswith('m'))
+    scratch = f"m{spills}"
+    labels = [int(b.label[1:]) for b in cfg.blocks if b.label and b.label[1:].isdigit()]
+    label_count = max(labels, default=0)
+
+    code = []
+    split_blocks = []
+    for block in cfg.blocks:
+        instrs = []
+        for instr in block.instrs:
+            op, args = decode(instr)
+            if op == 'PHI':
+                continue
+            roles = operand_roles(op, args)
+            args = [location(a) if r else a for a, r in zip(args, roles)]
+            if op != 'COPY' or args[0] != args[1]:
+                instrs.append(encode(op, args))
+
+        last_op, last_args = decode(instrs[-1]) if instrs else (None, [])
+        target = last_args[JUMP_TARGET[last_op]] if last_op in JUMP_TARGET else None
+        fall_through = []
+        for s in block.succs:
+            moves = parallel_copy(copies.get((block.index, s), []), scratch)
+            if not moves:
+                continue
+            if len(block.succs) == 1:
+                # Seul successeur : en fin de bloc, avant le saut éventuel
+                at = len(instrs) - 1 if target is not None else len(instrs)
+                instrs[at:at] = moves
+            elif cfg.blocks[s].label != target:
+                # Arc de sortie par défaut : bloc inséré juste après, sans étiquette
+                fall_through = moves
+            else:
+                label_count += 1
+                label = f"L{label_count}"
+                last_args[JUMP_TARGET[last_op]] = label
+                instrs[-1] = encode(last_op, last_args)
+                split_blocks += [f"{label}:"] + moves + [encode('GOTO', [target])]
+        code += instrs + fall_through
+
+    if split_blocks:
+        # Les blocs de coupure vont en fin de code : le programme doit les sauter
+        label_count += 1
+        end_label = f"L{label_count}"
+        if not code or decode(code[-1])[0] != 'GOTO':
+            code.append(encode('GOTO', [end_label]))
+        code += split_blocks + [f"{end_label}:"]
+    return code
+
+
+def allocate_registers(cfg, num_registers=NUM_REGISTERS):
+    """Renvoie (assignment, code) pour un CFG en SSA : l'affectation et le TAC final, sans PHI."""
+    intervals = live_intervals(cfg, temporaries(cfg))
+    assignment = linear_scan(intervals, num_registers)
+    return assignment, out_of_ssa(cfg, assignment)
+
+
+def check_allocation(cfg, assignment):
+    """Vérifie qu'aucun emplacement n'est partagé par deux noms vivants en même temps.
+
+    cfg est en forme SSA ; lève AssertionError au premier conflit trouvé.
+    """
+    live_in, live_out = liveness(cfg)
+
+    def conflict(a, b):
+        return (a != b and a in assignment and b in assignment
+                and assignment[a] == assignment[b])
+
+    for block in cfg.blocks:
+        live = set(live_out[block.index])
+        phi_defs = set()
+        for instr in reversed(block.instrs):
+            op, args = decode(instr)
+            if op == 'PHI':
+                phi_defs.add(args[-1])
+                continue
+            defs, uses = defs_uses(op, args)
+            for d in defs:
+                for other in live:
+                    assert not conflict(d, other), f"{instr} écrase {other} ({assignment[d]})"
+            live -= set(defs)
+            live |= set(uses)
+        entry = live | phi_defs
+        for a in entry:
+            for b in entry:
+                assert not conflict(a, b), f"{a} et {b} partagent {assignment[a]} en entrée de bloc"
+
+
+def run_tac(code, strings=None):
+    """Exécute un TAC sans PHI, comme le ferait une VM ; renvoie les valeurs affichées."""
+    constants = {const: value for value, const in (strings or {}).items()}
+    labels = {instr[:-1]: n for n, instr in enumerate(code) if instr.endswith(':')}
+    memory = {}
+    printed = []
+    binary = {'ADD': lambda a, b: a + b, 'SUB': lambda a, b: a - b, 'MUL': lambda a, b: a * b,
+              'DIV': lambda a, b: a // b if b != 0 else 0,
+              'LT': lambda a, b: a < b, 'GT': lambda a, b: a > b, 'LTE': lambda a, b: a <= b,
+              'GTE': lambda a, b: a >= b, 'EQ': lambda a, b: a == b, 'NEQ': lambda a, b: a != b}
+
+    def value(operand):
+        if operand in constants:
+            return constants[operand]
+        if operand == 'None':
+            return None
+        if operand in memory:
+            return memory[operand]
+        return int(operand)
+
+    pc = 0
+    while pc < len(code):
+        op, args = decode(code[pc])
+        pc += 1
+        if op == 'LABEL':
+            continue
+        if op == 'DECLARE':
+            memory[args[0]] = 0
+        elif op in ['LOAD', 'STORE', 'COPY']:
+            memory[args[1]] = value(args[0])
+        elif op == 'NOT':
+            memory[args[1]] = not value(args[0])
+        elif op == 'NEG':
+            memory[args[1]] = -value(args[0])
+        elif op in binary:
+            memory[args[2]] = binary[op](value(args[0]), value(args[1]))
+        elif op == 'PRINT':
+            printed.append(str(value(args[0])))
+        elif op == 'GOTO':
+            pc = labels[args[0]]
+        elif op in ['IFTRUE', 'IFFALSE']:
+            if bool(value(args[0])) == (op == 'IFTRUE'):
+                pc = labels[args[1]]
+        elif op.startswith('IF') and op[2:] in binary:
+            if binary[op[2:]](value(args[0]), value(args[1])):
+                pc = labels[args[2]]
+        else:
+            raise ValueError(f"instruction inconnue : {code[pc - 1]}")
+    return printed
+
+
+if __name__ == '__main__':
+    # Auto-vérification : python -m minipython.regalloc
+    import io
+    from .cfg import build_cfg
+    from .ssa import to_ssa
+    from .interpreter import TACGenerator, Interpreter, compile_source
+
+    programs = [
+        # && / || en valeur et en condition : PHI de temporaires
+        """int x, y, b; x = 0; y = 5;
+        while (x < 4 && (y > 1 || x == 0)) {
+            b = (x < 1 || y == 4) && !(x == y);
+            print(b);
+            print((x < y && y < 9) + (x == 2 || y == 2) + (x > 0 && y > 0 || x == 3));
+            x = x + 1; y = y - 1;
+        }""",
+        # Beaucoup de temporaires vivantes en même temps : débordements
+        """int a, b, c; a = 1; b = 2; c = 3;
+        print((a + 1) * ((b + 2) * ((c + 3) * ((a + 4) * ((b + 5) - (c + 6))))));
+        print(a + (b + (c + (a + (b + (c + (a + (b + (c + 10)))))))));""",
+        # Boucles imbriquées, if/else, division, négation
+        """int i, j, s; i = 0; s = 0;
+        while (i < 5) {
+            j = 0;
+            while (j < i) {
+                if (j == 2 || i - j > 3) { s = s + i * j; } else { s = s - j / 2; }
+                j = j + 1;
+            }
+            print(-s);
+            i = i + 1;
+        }""",
+        """string s; s = "a"; if (s == "a" && !(s != "a")) { print(s + "b"); } else { print(0); }""",
+    ]
+
+    # Programmes aléatoires (graine fixe) : && / || imbriqués dans les boucles et les tests
+    import random
+    rng = random.Random(29)
+
+    def expression(depth):
+        if depth == 0 or rng.random() < 0.2:
+            return rng.choice(['a', 'b', 'c', 'i', '0', '1', '2', '7'])
+        op = rng.choice(['+', '-', '*', '/', '<', '>', '<=', '>=', '==', '!=', '&&', '||', '&&', '||', '!', 'neg'])
+        if op == '!':
+            return f"!({expression(depth - 1)})"
+        if op == 'neg':
+            return f"-({expression(depth - 1)})"
+        return f"({expression(depth - 1)} {op} {expression(depth - 1)})"
+
+    for _ in range(150):
+        e = [expression(4) for _ in range(6)]
+        programs.append(f"""int a, b, c, i; a = 3; b = 2; c = 5; i = 0;
+        while (i < 3 && {e[0]}) {{
+            if ({e[1]}) {{ a = {e[2]}; }} else {{ b = {e[3]}; }}
+            print({e[4]});
+            c = c + 1; i = i + 1;
+        }}
+        print({e[5]});""")
+
+    for source in programs:
+        ast, symbol_table = compile_source(source)
+        out = io.StringIO()
+        Interpreter(symbol_table, out=out).exec_stmt(ast)
+        expected = out.getvalue().splitlines()
+
+        tac = TACGenerator()
+        tac.generate(ast)
+        ssa_cfg = to_ssa(build_cfg(tac.code))
+        assert run_tac(tac.code, tac.strings) == expected, "TAC"
+        for num_registers in [1, 2, 3, NUM_REGISTERS]:
+            assignment, code = allocate_registers(ssa_cfg, num_registers)
+            check_allocation(ssa_cfg, assignment)
+            assert not any(decode(instr)[0] == 'PHI' for instr in code)
+            assert run_tac(code, tac.strings) == expected, (num_registers, code)
+    # Arc critique par défaut : le premier bloc a deux successeurs et tombe dans
+    # L2, qui a deux prédécesseurs. %a.1 reste vivant par l'arc de retour après
+    # sa dernière lecture, et %c.1 survit à la définition de %d.1.
+    loop = build_cfg(['COPY 5, %a.1', 'COPY 7, %b.1', 'IFGT %a.1, %b.1 GOTO L1',
+                      'L2:', 'PHI %a.1, %d.1, %c.1', 'PRINT %c.1', 'PRINT %a.1',
+                      'IFGT %c.1, 6 GOTO L3',
+                      'ADD %c.1, 1, %d.1', 'ADD %c.1, %d.1, %e.1', 'PRINT %e.1', 'GOTO L2',
+                      'L1:', 'PRINT %b.1',
+                      'L3:'])
+    for num_registers in [1, 2, 3, NUM_REGISTERS]:
+        assignment, code = allocate_registers(loop, num_registers)
+        check_allocation(loop, assignment)
+        assert run_tac(code) == ['5', '5', '11', '6', '5', '13', '7', '5'], code
+
+    # Copies parallèles avec cycle : r0 <-> r1, et r1 -> m0 qui lit r1 avant l'échange
+    swap = parallel_copy([('r0', 'r1'), ('r1', 'r0'), ('r1', 'm0')], 'm1')
+    assert run_tac(['COPY 1, r0', 'COPY 2, r1'] + swap + ['PRINT r0', 'PRINT r1', 'PRINT m0']) == ['2', '1', '2']
+
+    print(f"{len(programs)} programmes vérifiés avec 1, 2, 3 et {NUM_REGISTERS} registres")
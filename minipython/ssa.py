@@ -0,0 +1,101 @@
+"""Mise en forme SSA (Static Single Assignment) du code à trois adresses.
+
+Chaque définition reçoit un nom versionné (`x.1`, `x.2`, ...) et des
+instructions `PHI` sont placées aux frontières de dominance (SSA
+élaguée : seulement là où le nom est vivant à l'entrée du bloc).
+Les opérandes d'un `PHI` suivent l'ordre des prédécesseurs du bloc ; la
+destination est le dernier opérande, comme pour les autres instructions.
+"""
+from .cfg import build_cfg, decode, encode, defs_uses, operand_roles, liveness
+
+
+def to_ssa(cfg):
+    """Renvoie un nouveau CFG en forme SSA. Les blocs inatteignables sont supprimés."""
+    idom = cfg.dominators()
+    frontiers = cfg.dominance_frontiers(idom)
+    children = cfg.dominator_tree(idom)
+    reachable = [block for block in cfg.blocks if block.index in idom]
+
+    live_in = liveness(cfg)[0]
+
+    def_blocks = {}
+    for block in reachable:
+        for instr in block.instrs:
+            for d in defs_uses(*decode(instr))[0]:
+                def_blocks.setdefault(d, set()).add(block.index)
+
+    # Placement des PHI, seulement là où le nom est vivant (SSA élaguée)
+    phis = {b: [] for b in idom}
+    for name in sorted(def_blocks):
+        worklist = list(def_blocks[name])
+        has_phi = set()
+        while worklist:
+            b = worklist.pop()
+            for d in frontiers[b]:
+                if d not in has_phi and name in live_in[d]:
+                    has_phi.add(d)
+                    phis[d].append(name)
+                    if d not in def_blocks[name]:
+                        worklist.append(d)
+
+    # Renommage en parcourant l'arbre des dominateurs
+    counters = {}
+    stacks = {}
+    renamed = {}
+    phi_dests = {b: {} for b in idom}
+    phi_args = {b: {name: [] for name in phis[b]} for b in idom}
+    preds = {b: [p for p in cfg.blocks[b].preds if p in idom] for b in idom}
+
+    def new_version(name):
+        counters[name] = counters.get(name, 0) + 1
+        version = f"{name}.{counters[name]}"
+        stacks.setdefault(name, []).append(version)
+        return version
+
+    def current(name):
+        stack = stacks.get(name)
+        return stack[-1] if stack else f"{name}.0"
+
+    work = [(cfg.entry.index, None)]
+    while work:
+        b, pushed = work.pop()
+        if pushed is not None:
+            for name in pushed:
+                stacks[name].pop()
+            continue
+
+        pushed = []
+        for name in phis[b]:
+            phi_dests[b][name] = new_version(name)
+            pushed.append(name)
+
+        instrs = []
+        for instr in cfg.blocks[b].instrs:
+            op, args = decode(instr)
+            roles = operand_roles(op, args)
+            args = [current(a) if r == 'use' else a for a, r in zip(args, roles)]
+            for i, r in enumerate(roles):
+                if r == 'def':
+                    pushed.append(args[i])
+                    args[i] = new_version(args[i])
+            instrs.append(encode(op, args))
+        renamed[b] = instrs
+
+        for s in cfg.blocks[b].succs:
+            for name in phis[s]:
+                phi_args[s][name].append((preds[s].index(b), current(name)))
+
+        work.append((b, pushed))
+        for c in reversed(children[b]):
+            work.append((c, None))
+
+    code = []
+    for block in reachable:
+        instrs = renamed[block.index]
+        head = instrs[:1] if block.label else []
+        phi_instrs = []
+        for name in phis[block.index]:
+            args = [version for _, version in sorted(phi_args[block.index][name])]
+            phi_instrs.append(encode('PHI', args + [phi_dests[block.index][name]]))
+        code.extend(head + phi_instrs + instrs[len(head):])
+    return build_cfg(code)